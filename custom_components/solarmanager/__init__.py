@@ -12,7 +12,6 @@ from homeassistant.helpers import (
 
 from .const import CONF_API_KEY, CONF_SM_ID, DOMAIN, PLATFORMS
 from .coordinator import SolarmanagerCoordinator, daily_store
-from .entity import site_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -73,7 +72,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Site-Gerät explizit registrieren bevor Plattformen geladen werden,
     # damit via_device-Referenzen in number/select/datetime/binary_sensor greifen.
-    info = site_device_info(coord)
+    info = coord.site_device_info()
     registry = dr.async_get(hass)
     registry.async_get_or_create(
         config_entry_id=entry.entry_id,
@@ -2,16 +2,54 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
 import logging
+import random
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 import aiohttp
 
+from homeassistant.util.json import json_loads
+
 _LOGGER = logging.getLogger(__name__)
 
-REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
-LOCAL_TIMEOUT = aiohttp.ClientTimeout(total=10)
+# Ein gemeinsames Timeout-Objekt für alle Requests (nicht pro Call neu bauen).
+# Verbindungsaufbau getrennt begrenzen: ist die Cloud nicht erreichbar, soll
+# der Poll nach 5 s scheitern statt die vollen 30 s zu blockieren. Keep-Alive
+# übernimmt der Connector der geteilten HA-Session (async_get_clientsession) —
+# bei 10-s-Polls auf denselben Host bleibt die TLS-Verbindung dort offen, eine
+# eigene Session mit eigenem Connector bringt daher keinen Vorteil.
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5, sock_connect=5, sock_read=25)
+LOCAL_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5, sock_connect=5)
+
+# Lokales Request-Budget (Sliding Window) — hält Bursts (Setup, PUT + Meta-
+# Refresh, …) unter dem Cloud-Rate-Limit, statt erst in ein 429 zu laufen.
+# Nach einem 429 wird das Budget halbiert und erholt sich pro erfolgreichem
+# Request um 1; ein X-RateLimit-Limit-Header begrenzt es nach oben.
+RPM_LIMIT = 60  # Requests pro Fenster
+RPM_MIN = 10
+RPM_WINDOW = 60.0  # Sekunden
+
+# Steuer-PUTs (idempotent) bei transienten Fehlern begrenzt wiederholen:
+# Netzwerkfehler, 429 und 502/503/504. Wartezeit exponentiell mit ±10 %
+# Jitter bzw. laut Retry-After, je Versuch höchstens PUT_RETRY_MAX_DELAY.
+PUT_MAX_RETRIES = 4
+PUT_RETRY_BASE = 1.0  # Sekunden
+PUT_RETRY_MAX_DELAY = 30.0  # Sekunden
+PUT_RETRY_STATUS = frozenset({502, 503, 504})
+
+# Token vor Ablauf erneuern: lange gültige Tokens 5 min vorher (fängt Uhren-
+# Versatz zum Server ab), kurze nur mit 30 s Sicherheitsabstand.
+TOKEN_REFRESH_MARGIN = 300  # Sekunden
+TOKEN_REFRESH_MARGIN_SHORT = 30  # Sekunden
+
+
+def _token_expiry(exp_sec: int) -> float:
+    """Epoch-Zeitpunkt, ab dem ein Token mit Laufzeit exp_sec erneuert wird."""
+    if exp_sec > 2 * TOKEN_REFRESH_MARGIN:
+        return time.time() + exp_sec - TOKEN_REFRESH_MARGIN
+    return time.time() + exp_sec - TOKEN_REFRESH_MARGIN_SHORT
 
 
 async def _check_status(r: aiohttp.ClientResponse, *, context: str) -> None:
@@ -19,10 +57,34 @@ async def _check_status(r: aiohttp.ClientResponse, *, context: str) -> None:
     if r.status in (401, 403):
         raise SolarmanagerAuthError(f"{context} auth failed (HTTP {r.status})")
     if r.status == 429:
-        raise SolarmanagerRateLimit("Rate limited")
+        raise SolarmanagerRateLimit("Rate limited", retry_after=_retry_after(r))
     if r.status >= 400:
         text = await r.text()
-        raise SolarmanagerApiError(f"{context} failed {r.status}: {text}")
+        raise SolarmanagerApiError(f"{context} failed {r.status}: {text}", status=r.status)
+
+
+def _retry_after(r: aiohttp.ClientResponse) -> float | None:
+    """Retry-After (Sekunden) aus der Antwort lesen; HTTP-Datumsformat wird ignoriert."""
+    try:
+        return max(0.0, float(r.headers["Retry-After"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+async def _read_json(r: aiohttp.ClientResponse, *, context: str) -> Any:
+    """Body als JSON dekodieren — direkt aus den Bytes.
+
+    r.json() dekodiert den Body erst in einen str und parst dann; orjson liest
+    Bytes direkt, das spart bei jedem Poll die Zwischenkopie des Payloads.
+    Leerer Body → None (wie r.json()).
+    """
+    body = await r.read()
+    if not body.strip():
+        return None
+    try:
+        return json_loads(body)
+    except ValueError as err:
+        raise SolarmanagerApiError(f"{context} returned invalid JSON: {err}") from err
 
 
 def normalize_local_host(host: str) -> str:
@@ -42,10 +104,18 @@ class SolarmanagerAuthError(Exception):
 class SolarmanagerRateLimit(Exception):
     """API-Rate-Limit überschritten (HTTP 429)."""
 
+    def __init__(self, msg: str, *, retry_after: float | None = None) -> None:
+        super().__init__(msg)
+        self.retry_after = retry_after  # Sekunden laut Retry-After-Header
+
 
 class SolarmanagerApiError(Exception):
     """Sonstiger API-Fehler (inkl. Netzwerkfehler/Timeouts)."""
 
+    def __init__(self, msg: str, *, status: int | None = None) -> None:
+        super().__init__(msg)
+        self.status = status  # HTTP-Status; None bei Netzwerkfehler/Timeout
+
 
 class SolarmanagerCloud:
     """
@@ -66,6 +136,7 @@ class SolarmanagerCloud:
         password: str,
         sm_id: str,
         api_key: Optional[str] = None,  # optional: v3 API Key statt v1 Login
+        on_refresh_token: Callable[[str], None] | None = None,
     ):
         self._s = session
         self._base = base.rstrip("/")
@@ -73,6 +144,17 @@ class SolarmanagerCloud:
         self._password = password
         self.sm_id = sm_id
         self.api_key = api_key
+        # Wird mit jedem neu ausgestellten v1-Refresh-Token aufgerufen (Persistenz)
+        self._on_refresh_token = on_refresh_token
+
+        # Pfade der Poll-Endpunkte sind nach __init__ fix; die zugehörigen
+        # absoluten URLs werden beim ersten Request gecacht (_url).
+        self._path_stream = f"/v3/users/{sm_id}/data/stream"
+        self._path_sensors = f"/v1/info/sensors/{sm_id}"
+        self._path_stats = f"/v1/statistics/gateways/{sm_id}"
+        self._urls: Dict[str, str] = {}
+        # ETag je Pfad für bedingte GETs (304 → kein Body, kein Decode)
+        self._etags: Dict[str, str] = {}
 
         # Token-Zustand
         self._access: Optional[str] = None
@@ -81,15 +163,65 @@ class SolarmanagerCloud:
         self._exp_ts: float = 0.0  # Epoch-Sekunden
         self._auth_lock = asyncio.Lock()
 
+        # Header-Dict pro Token nur einmal bauen (aiohttp kopiert es ohnehin
+        # in den Request) — nicht bei jedem 10-s-Poll neu formatieren.
+        self._bearer: Dict[str, str] = {}
+        self._bearer_key: tuple[str, str | None] | None = None
+
+        # Sliding-Window-Budget (time.monotonic() der letzten Requests)
+        self._recent: deque[float] = deque()
+        self._rpm_limit: int = RPM_LIMIT
+        self._rpm_ceiling: int = RPM_LIMIT
+        self._throttle_lock = asyncio.Lock()
+
+    def _url(self, path: str) -> str:
+        """Absolute URL zu einem API-Pfad (gecacht, der Stream läuft alle 10 s)."""
+        url = self._urls.get(path)
+        if url is None:
+            url = self._urls[path] = f"{self._base}/{path.lstrip('/')}"
+        return url
+
+    # -------------------- Rate-Budget --------------------
+
+    async def _throttle(self) -> None:
+        """Vor jedem Request: warten, bis im Fenster wieder Budget frei ist."""
+        async with self._throttle_lock:
+            now = time.monotonic()
+            while self._recent and self._recent[0] <= now - RPM_WINDOW:
+                self._recent.popleft()
+            if len(self._recent) >= self._rpm_limit:
+                wait = self._recent[0] + RPM_WINDOW - now
+                _LOGGER.debug("Request budget exhausted — waiting %.1f s", wait)
+                await asyncio.sleep(wait)
+                now = time.monotonic()
+                while self._recent and self._recent[0] <= now - RPM_WINDOW:
+                    self._recent.popleft()
+            self._recent.append(time.monotonic())
+
+    def _note_rate_limit(self, r: aiohttp.ClientResponse) -> None:
+        """Budget anhand der Antwort nachführen (429 → halbieren, sonst +1)."""
+        try:
+            limit = int(r.headers["X-RateLimit-Limit"])
+        except (KeyError, TypeError, ValueError):
+            pass
+        else:
+            self._rpm_ceiling = max(RPM_MIN, min(RPM_LIMIT, limit))
+        if r.status == 429:
+            self._rpm_limit = max(RPM_MIN, self._rpm_limit // 2)
+        else:
+            self._rpm_limit = min(self._rpm_ceiling, self._rpm_limit + 1)
+
     # -------------------- OAuth --------------------
 
     async def _post_auth(self, path: str, payload: dict) -> dict:
         """POST-Helper für Auth-Endpunkte mit Netzwerk-Fehler-Mapping."""
-        url = f"{self._base}{path}"
+        url = self._url(path)
+        await self._throttle()
         try:
             async with self._s.post(url, json=payload, timeout=REQUEST_TIMEOUT) as r:
+                self._note_rate_limit(r)
                 await _check_status(r, context=f"POST {path}")
-                return await r.json()
+                return await _read_json(r, context=f"POST {path}")
         except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             raise SolarmanagerApiError(f"POST {path} unreachable: {err}") from err
 
@@ -102,7 +234,7 @@ class SolarmanagerCloud:
         )
         self._access = data.get("access_token")  # snake_case, anders als v1!
         exp_sec = int(data.get("expires_in", 86400))
-        self._exp_ts = time.time() + exp_sec - 30
+        self._exp_ts = _token_expiry(exp_sec)
         if not self._access:
             raise SolarmanagerAuthError("No access_token in v3/auth/refresh response")
 
@@ -116,9 +248,10 @@ class SolarmanagerCloud:
         self._refresh = data.get("refreshToken")
         self._token_type = data.get("tokenType", "Bearer")
         exp_sec = int(data.get("expiresIn", 3600))
-        self._exp_ts = time.time() + exp_sec - 30
+        self._exp_ts = _token_expiry(exp_sec)
         if not self._access:
             raise SolarmanagerAuthError("No accessToken in response")
+        self._notify_refresh_token()
 
     async def _refresh_v1(self) -> None:
         """POST /v1/oauth/refresh (Fallback; gültig bis 30.06.2027)."""
@@ -127,9 +260,14 @@ class SolarmanagerCloud:
         self._refresh = data.get("refreshToken", self._refresh)
         self._token_type = data.get("tokenType", self._token_type or "Bearer")
         exp_sec = int(data.get("expiresIn", 3600))
-        self._exp_ts = time.time() + exp_sec - 30
+        self._exp_ts = _token_expiry(exp_sec)
         if not self._access:
             raise SolarmanagerAuthError("No accessToken after refresh")
+        self._notify_refresh_token()
+
+    def _notify_refresh_token(self) -> None:
+        if self._on_refresh_token and self._refresh:
+            self._on_refresh_token(self._refresh)
 
     async def login(self) -> None:
         """Authentifiziert: v3/auth/refresh wenn api_key gesetzt, sonst v1/oauth/login."""
@@ -138,6 +276,16 @@ class SolarmanagerCloud:
         else:
             await self._login_v1()
 
+    async def resume(self, refresh_token: str) -> None:
+        """Mit einem gespeicherten v1-Refresh-Token starten statt mit Login.
+
+        Spart nach einem HA-Neustart den Passwort-Login; ist der Token
+        abgelaufen, fällt _ensure_token selbst auf den vollen Login zurück.
+        """
+        self._refresh = refresh_token
+        self._invalidate_token()
+        await self._ensure_token()
+
     def _invalidate_token(self) -> None:
         self._access = None
         self._exp_ts = 0.0
@@ -165,10 +313,15 @@ class SolarmanagerCloud:
                 await self._login_v1()
 
     def _bearer_headers(self) -> Dict[str, str]:
-        return {
-            "Authorization": f"{self._token_type} {self._access}",
-            "accept": "application/json",
-        }
+        # Header nur neu bauen, wenn sich Token oder tokenType geändert haben
+        key = (self._token_type, self._access)
+        if self._bearer_key != key:
+            self._bearer = {
+                "Authorization": f"{self._token_type} {self._access}",
+                "accept": "application/json",
+            }
+            self._bearer_key = key
+        return self._bearer
 
     # -------------------- Authentifizierte Requests --------------------
 
@@ -180,21 +333,32 @@ class SolarmanagerCloud:
         json: dict | None = None,
         params: dict | None = None,
         parse_json: bool = True,
+        conditional: bool = False,
     ) -> Any:
         """Request mit Bearer-Token, Netzwerk-Fehler-Mapping und einmaligem
-        Retry bei 401 (Token kann serverseitig invalidiert worden sein)."""
-        url = f"{self._base}/{path.lstrip('/')}"
+        Retry bei 401 (Token kann serverseitig invalidiert worden sein).
+
+        conditional=True: If-None-Match mit dem zuletzt gesehenen ETag senden;
+        bei 304 (unverändert) wird None zurückgegeben.
+        """
+        url = self._url(path)
         await self._ensure_token()
         for attempt in (0, 1):
+            headers = self._bearer_headers()
+            etag = self._etags.get(path) if conditional else None
+            if etag:
+                headers = {**headers, "If-None-Match": etag}
+            await self._throttle()
             try:
                 async with self._s.request(
                     method,
                     url,
                     json=json,
                     params=params,
-                    headers=self._bearer_headers(),
+                    headers=headers,
                     timeout=REQUEST_TIMEOUT,
                 ) as r:
+                    self._note_rate_limit(r)
                     if r.status == 401 and attempt == 0:
                         _LOGGER.debug(
                             "401 on %s %s — refreshing token, retrying once",
@@ -204,10 +368,17 @@ class SolarmanagerCloud:
                         self._invalidate_token()
                         await self._ensure_token()
                         continue
+                    if r.status == 304:
+                        return None
                     await _check_status(r, context=f"{method} {path}")
                     if not parse_json or r.status == 204:
                         return None
-                    return await r.json()
+                    data = await _read_json(r, context=f"{method} {path}")
+                    # ETag erst nach erfolgreichem Dekodieren merken — sonst
+                    # liefert der nächste Abruf 304 für Daten, die nie ankamen
+                    if conditional and (new_etag := r.headers.get("ETag")):
+                        self._etags[path] = new_etag
+                    return data
             except (aiohttp.ClientError, asyncio.TimeoutError) as err:
                 raise SolarmanagerApiError(f"{method} {path} unreachable: {err}") from err
         return None  # nicht erreichbar (Schleife endet immer mit return/raise)
@@ -219,15 +390,49 @@ class SolarmanagerCloud:
         GET /v3/users/{smId}/data/stream
         Liefert Felder wie: v, t, iv, pW, cW, iW, eW, bcW, bdW, soc, ... und devices[].
         """
-        return await self._authed_request("GET", f"/v3/users/{self.sm_id}/data/stream")
+        return await self._authed_request("GET", self._path_stream)
 
-    async def list_devices(self) -> list[dict]:
-        """GET /v1/info/sensors/{smId} → Liste der Geräte mit _id und (tag.name | name)."""
-        return await self._authed_request("GET", f"/v1/info/sensors/{self.sm_id}")
+    async def list_devices(self) -> list[dict] | None:
+        """GET /v1/info/sensors/{smId} → Liste der Geräte mit _id und (tag.name | name).
+
+        Bedingter GET: None, wenn sich seit dem letzten Abruf nichts geändert hat (304).
+        """
+        return await self._authed_request("GET", self._path_sensors, conditional=True)
+
+    def forget_device_list_etag(self) -> None:
+        """Nächsten list_devices()-Abruf wieder vollständig (ohne If-None-Match) laden."""
+        self._etags.pop(self._path_sensors, None)
 
     async def _put_control(self, path: str, payload: dict) -> None:
-        """Generischer PUT-Helper für alle /control/… Endpunkte."""
-        await self._authed_request("PUT", path, json=payload, parse_json=False)
+        """Generischer PUT-Helper für alle /control/… Endpunkte.
+
+        Transiente Fehler (siehe PUT_RETRY_STATUS) werden bis zu
+        PUT_MAX_RETRIES-mal wiederholt, damit ein kurzer Cloud-Hänger keine
+        Einstellungsänderung verschluckt; 401 behandelt _authed_request.
+        Serialisiert wird über json= — die HA-Session nutzt dafür bereits
+        orjson (json_serialize), eigenes Vor-Serialisieren spart nichts.
+        """
+        for attempt in range(PUT_MAX_RETRIES + 1):
+            try:
+                await self._authed_request("PUT", path, json=payload, parse_json=False)
+                return
+            except SolarmanagerRateLimit as err:
+                if attempt == PUT_MAX_RETRIES:
+                    raise
+                delay = err.retry_after
+            except SolarmanagerApiError as err:
+                if attempt == PUT_MAX_RETRIES or (
+                    err.status is not None and err.status not in PUT_RETRY_STATUS
+                ):
+                    raise
+                delay = None
+            if delay is None:
+                delay = PUT_RETRY_BASE * 2**attempt * random.uniform(0.9, 1.1)
+            delay = min(delay, PUT_RETRY_MAX_DELAY)
+            _LOGGER.debug(
+                "PUT %s failed (attempt %d) — retrying in %.1f s", path, attempt + 1, delay
+            )
+            await asyncio.sleep(delay)
 
     async def put_battery_settings(self, sensor_id: str, payload: dict) -> None:
         """PUT /v2/control/battery/{sensorId}"""
@@ -271,7 +476,7 @@ class SolarmanagerCloud:
         """
         return await self._authed_request(
             "GET",
-            f"/v1/statistics/gateways/{self.sm_id}",
+            self._path_stats,
             params={"from": from_dt, "to": to_dt, "accuracy": accuracy},
         )
 
@@ -304,7 +509,7 @@ class SolarmanagerLocal:
                 timeout=LOCAL_TIMEOUT,
             ) as r:
                 await _check_status(r, context="GET /v2/point")
-                return await r.json()
+                return await _read_json(r, context="GET /v2/point")
         except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             raise SolarmanagerApiError(f"Local API unreachable: {err}") from err
 
@@ -318,7 +523,7 @@ class SolarmanagerLocal:
                 timeout=LOCAL_TIMEOUT,
             ) as r:
                 await _check_status(r, context="GET /v2/devices")
-                data = await r.json()
+                data = await _read_json(r, context="GET /v2/devices")
         except (aiohttp.ClientError, asyncio.TimeoutError) as err:
             raise SolarmanagerApiError(f"Local devices unreachable: {err}") from err
         return [
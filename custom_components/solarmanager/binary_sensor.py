@@ -13,7 +13,6 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import SolarmanagerCoordinator
-from .entity import child_device_info, find_device
 
 PARALLEL_UPDATES = 1
 
@@ -30,9 +29,8 @@ async def async_setup_entry(
     @callback
     def _sync_devices() -> None:
         new_entities: list[BinarySensorEntity] = []
-        for dev in (coord.data or {}).get("devices", []) or []:
-            dev_id = str(dev.get("_id") or "")
-            if not dev_id or dev_id in created:
+        for dev_id, dev in coord.stream_devices.items():
+            if dev_id in created:
                 continue
             if "signal" in dev:
                 created.add(dev_id)
@@ -61,11 +59,11 @@ class DeviceConnectivitySensor(
 
     @property
     def device_info(self) -> dict[str, Any]:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     @property
     def is_on(self) -> bool | None:
-        dev = find_device(self.coordinator.data, self._dev_id)
+        dev = self.coordinator.get_stream_device(self._dev_id)
         if dev is None:
             return None
         return dev.get("signal") == "connected"
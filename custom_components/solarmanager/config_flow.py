@@ -29,6 +29,7 @@ from .const import (
     CONF_HOST,
     CONF_MODE,
     CONF_PASSWORD,
+    CONF_REFRESH_TOKEN,
     CONF_SCAN_INTERVAL,
     CONF_SCHEME,
     CONF_SM_ID,
@@ -241,6 +242,8 @@ class SolarmanagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_EMAIL: email,
                         CONF_PASSWORD: password,
                         CONF_API_KEY: api_key or None,
+                        # Token gehört zu den alten Zugangsdaten
+                        CONF_REFRESH_TOKEN: None,
                     },
                 )
 
@@ -414,6 +417,7 @@ class SolarmanagerConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_PASSWORD: password,
                         CONF_SM_ID: sm_id,
                         CONF_API_KEY: api_key or None,
+                        CONF_REFRESH_TOKEN: None,
                     },
                 )
 
@@ -10,6 +10,8 @@ CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
 CONF_SM_ID = "sm_id"
 CONF_API_KEY = "api_key"  # optional; nur nutzen, wenn du bewusst Basic-Auth statt OAuth brauchst
+# v1-Refresh-Token, vom Coordinator persistiert (Neustart ohne Passwort-Login)
+CONF_REFRESH_TOKEN = "refresh_token"
 
 # Optionen
 CONF_SCAN_INTERVAL = "scan_interval"
@@ -1,15 +1,18 @@
 # coordinator.py
 from __future__ import annotations
 
+import asyncio
 from datetime import timedelta
 import logging
+import random
 import time
 from typing import Any, NoReturn
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.util import dt as dt_util
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import issue_registry as ir
 from homeassistant.helpers.storage import Store
 from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
@@ -20,14 +23,19 @@ from .const import (
     CONF_PASSWORD,
     CONF_SM_ID,
     CONF_API_KEY,
+    CONF_REFRESH_TOKEN,
     CONF_SCAN_INTERVAL,
     DEFAULT_SCAN,
     CLOUD_BASE,
     CONF_HOST,
     CONF_SCHEME,
     CONF_MODE,
+    MANUFACTURER,
     MODE_LOCAL,
+    MODEL,
+    MODEL_LOCAL,
 )
+from .entity import as_float, as_int
 from .api_client import (
     SolarmanagerCloud,
     SolarmanagerLocal,
@@ -43,6 +51,17 @@ _LOGGER = logging.getLogger(__name__)
 # PUTs wird gezielt via async_refresh_device_meta() aktualisiert.
 META_TTL = 60  # Sekunden
 
+# Adaptives Polling bei HTTP 429 (AIMD): Intervall verdoppeln (mit ±10 %
+# Jitter, damit nicht alle Installationen im Gleichtakt pollen) und nach jedem
+# erfolgreichen Poll um 1 s zurück Richtung konfiguriertem Intervall gehen.
+BACKOFF_MAX_INTERVAL = 300  # Sekunden
+BACKOFF_RECOVER_STEP = 1  # Sekunden pro erfolgreichem Poll
+BACKOFF_JITTER = 0.1
+
+# Slider-Änderungen an Batterie-Settings sammeln: erst wenn BATTERY_DEBOUNCE
+# Sekunden lang keine weitere Änderung kam, geht EIN zusammengeführter PUT raus
+BATTERY_DEBOUNCE = 0.5  # Sekunden
+
 # Tages-Statistiken (Cloud) höchstens alle 5 Minuten laden
 STATS_TTL = 300  # Sekunden
 
@@ -89,6 +108,37 @@ BATTERY_PUT_FIELDS = frozenset({
 })
 
 
+# Numerische Felder des Streams (Cloud /v3/.../stream bzw. lokal /v2/point)
+STREAM_NUM_KEYS = (
+    # Leistungen (W): PV, Verbrauch, Batterie Laden +/Entladen +, Netz Import +/Export +
+    "pW", "cW", "bcW", "bdW", "iW", "eW",
+    # Energie-Intervallwerte (Wh)
+    "pWh", "cWh", "iWh", "eWh", "bcWh", "bdWh",
+    # Batterie
+    "soc",
+)
+
+# Numerische Felder je Gerät in devices[] (Geräte-Sensoren, Übersicht)
+DEVICE_NUM_KEYS = (
+    "power", "soc", "temperature", "heatingAdjustment", "remainingRange",
+    "iWh", "eWh", "iWhTotal", "eWhTotal",
+)
+
+
+def _device_meta_entry(d: dict[str, Any]) -> dict[str, Any]:
+    """Metadaten-Eintrag {name, type, raw} für ein Gerät aus /v1/info/sensors."""
+    d_get = d.get
+    typ = d_get("type") or d_get("device_type") or None
+    # Name-Prio: expliziter "name" (falls vorhanden) sonst tag.name, sonst Typen-Fallback
+    dg = d_get("device_group")
+    friendly = (
+        d_get("name")
+        or (d_get("tag") or {}).get("name")
+        or (f"{typ} ({dg})" if typ and dg else typ)
+    )
+    return {"name": friendly, "type": typ, "raw": d}
+
+
 def daily_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
     """Store für die persistierten Tageszähler eines Config-Entries."""
     return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}_daily")
@@ -98,26 +148,46 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
     """Coordinator, der den v3-Stream pollt, Daten normalisiert und Geräte-Metadaten cached (aus /v1/info/sensors/{smId})."""
 
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+        base_interval = entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN)
         super().__init__(
             hass,
             _LOGGER,
             config_entry=entry,
             name=DOMAIN,
-            update_interval=timedelta(
-                seconds=entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN)
-            ),
+            update_interval=timedelta(seconds=base_interval),
         )
         self.entry = entry
+
+        # Poll-Intervall: konfiguriert vs. aktuell (nach 429-Backoff erhöht)
+        self._base_interval: float = float(base_interval)
+        self._cur_interval: float = float(base_interval)
         self.is_local: bool = entry.data.get(CONF_MODE) == MODE_LOCAL
         self.client: SolarmanagerCloud | SolarmanagerLocal | None = None
 
-        # Cache für Geräte-Metadaten: exakt per _id
-        self.device_meta: dict[str, dict] = {}
-        self._meta_last: float = 0.0
+        # Cache für Geräte-Metadaten: exakt per _id (Setter baut die flachen
+        # Indizes _name_by_id/_type_by_id/_settings_by_id mit auf)
+        self.device_meta = {}
+        # time.monotonic() des letzten Ladeversuchs; -inf = noch nie geladen
+        # (monotonic beginnt beim Boot nahe 0, 0.0 wäre kein sicherer Startwert)
+        self._meta_last: float = float("-inf")
+
+        # device_info je Gerät + Name, aus dem es gebaut wurde (child_device_info)
+        self._child_device_info: dict[str, tuple[str | None, dict[str, Any]]] = {}
+        # device_info des Site-Geräts + site_id, aus der es gebaut wurde
+        self._site_device_info: tuple[str, dict[str, Any]] | None = None
+
+        # devices[] des letzten erfolgreichen Polls, indiziert per _id
+        self._device_index: dict[str, dict[str, Any]] = {}
+
+        # Gesammelte Batterie-Änderungen je Gerät (siehe async_queue_battery_put)
+        self._pending_battery: dict[str, dict[str, Any]] = {}
+        self._pending_battery_timer: dict[str, asyncio.TimerHandle] = {}
+        # Verzögerte PUTs nacheinander, damit ältere Werte keine neueren überholen
+        self._battery_put_lock = asyncio.Lock()
 
         # Tages-Statistiken (production, consumption, …) — nur Cloud
         self._stats_data: dict[str, Any] = {}
-        self._stats_last: float = 0.0
+        self._stats_last: float = float("-inf")  # time.monotonic(), wie _meta_last
         self._stats_date: str = ""
 
         # Tages-Energie (Lokal): Riemann-Integration von pW/cW/iW/eW
@@ -126,7 +196,7 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self._local_grid_import_wh: float = 0.0
         self._local_grid_export_wh: float = 0.0
         self._local_day: str = ""
-        self._local_t: float = 0.0
+        self._local_t: float = 0.0  # time.monotonic() des letzten Polls
 
         # Tages-Batterieenergie (beide Modi): Summierung der bcWh/bdWh-Intervallwerte
         self._bat_charge_wh: float = 0.0
@@ -163,18 +233,31 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 password=self.entry.data[CONF_PASSWORD],
                 sm_id=self.entry.data[CONF_SM_ID],
                 api_key=self.entry.data.get(CONF_API_KEY),
+                on_refresh_token=self._store_refresh_token,
             )
             # _async_setup wird vom Coordinator-Framework außerhalb von
             # _async_update_data aufgerufen — dessen Exception-Mapping greift
             # hier nicht. Ohne Mapping landet ein Auth-Fehler beim Login im
             # generischen Framework-Handler und löst nie den Reauth-Flow aus.
+            refresh_token = self.entry.data.get(CONF_REFRESH_TOKEN)
             try:
-                await self.client.login()
+                if refresh_token and not self.client.api_key:
+                    await self.client.resume(refresh_token)
+                else:
+                    await self.client.login()
             except (SolarmanagerAuthError, SolarmanagerRateLimit, SolarmanagerApiError) as err:
                 self._raise_mapped_client_error(err)
         await self._async_restore_daily()
         await self._load_device_meta()
 
+    @callback
+    def _store_refresh_token(self, refresh_token: str) -> None:
+        """Neuen v1-Refresh-Token im Config-Entry ablegen (übersteht Neustarts)."""
+        if self.entry.data.get(CONF_REFRESH_TOKEN) != refresh_token:
+            self.hass.config_entries.async_update_entry(
+                self.entry, data={**self.entry.data, CONF_REFRESH_TOKEN: refresh_token}
+            )
+
     # -------------------- Persistenz Tageszähler --------------------
 
     async def _async_restore_daily(self) -> None:
@@ -212,63 +295,206 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
 
     # -------------------- Geräte-Metadaten --------------------
 
+    @property
+    def device_meta(self) -> dict[str, dict]:
+        return self._device_meta
+
+    @device_meta.setter
+    def device_meta(self, meta: dict[str, dict]) -> None:
+        """Metadaten setzen und die flachen Lookup-Indizes neu aufbauen.
+
+        Entitäten lesen Name und Settings bei jedem State-Update; statt
+        device_meta[id]["raw"]["data"][field] (vier Dict-Hops) reicht so ein
+        Lookup. Neu gebaut wird nur hier, d. h. beim Laden der Metadaten.
+        """
+        self._device_meta = meta
+        self._name_by_id: dict[str, str | None] = {}
+        self._type_by_id: dict[str, str] = {}
+        self._settings_by_id: dict[str, dict[str, Any]] = {}
+        for dev_id, m in meta.items():
+            self._name_by_id[dev_id] = m.get("name")
+            self._type_by_id[dev_id] = (m.get("type") or "").lower()
+            self._settings_by_id[dev_id] = (m.get("raw") or {}).get("data") or {}
+
     async def _load_device_meta(self) -> None:
         """Geräte-Metadaten aus /v1/info/sensors/{smId} (Cloud) oder /v2/devices (Lokal) laden."""
         if not self.client:
             return
         # Auch bei Fehlern erst nach META_TTL erneut versuchen — sonst feuert
         # bei API-Störung jeder Poll einen zusätzlichen fehlschlagenden Request.
-        self._meta_last = time.time()
+        self._meta_last = time.monotonic()
         try:
             raw = await self.client.list_devices()
+            if raw is None:
+                _LOGGER.debug("Device metadata unchanged (HTTP 304)")
+                return
             items = raw.get("items", raw) if isinstance(raw, dict) else raw
-            meta: dict[str, dict] = {}
-            for d in items or []:
-                dev_id = str(d.get("_id") or "")
-                if not dev_id:
-                    continue
-                # Name-Prio: expliziter "name" (falls vorhanden) sonst tag.name, sonst Typen-Fallback
-                tag = d.get("tag") or {}
-                friendly = d.get("name") or tag.get("name") or None
-                typ = d.get("type") or d.get("device_type") or None
-                if not friendly:
-                    dg = d.get("device_group") or ""
-                    if typ and dg:
-                        friendly = f"{typ} ({dg})"
-                    elif typ:
-                        friendly = typ
-                meta[dev_id] = {"name": friendly, "type": typ, "raw": d}
+            meta: dict[str, dict] = {
+                str(dev_id): _device_meta_entry(d)
+                for d in items or []
+                if (dev_id := d.get("_id"))
+            }
             self.device_meta = meta
             _LOGGER.debug("Loaded %d device metadata entries (info/devices)", len(self.device_meta))
         except Exception as e:
             _LOGGER.debug("Could not fetch device metadata from info/devices: %s", e)
+            # Antwort evtl. empfangen, aber nicht verarbeitet → beim nächsten
+            # Mal ohne If-None-Match laden, sonst bliebe der Cache per 304 veraltet
+            if isinstance(self.client, SolarmanagerCloud):
+                self.client.forget_device_list_etag()
+
+    def site_device_info(self) -> dict[str, Any]:
+        """device_info für das Site-Gerät (Gateway).
+
+        Alle Site-Entitäten teilen sich ein Dict; neu gebaut wird nur bei
+        geänderter site_id.
+        """
+        site_id = self.site_id
+        cached = self._site_device_info
+        if cached is not None and cached[0] == site_id:
+            return cached[1]
+        info = {
+            "identifiers": {(DOMAIN, f"site_{site_id}")},
+            "name": f"Solarmanager {site_id}",
+            "manufacturer": MANUFACTURER,
+            "model": MODEL_LOCAL if self.is_local else MODEL,
+        }
+        self._site_device_info = (site_id, info)
+        return info
+
+    def child_device_info(self, dev_id: str) -> dict[str, Any]:
+        """device_info für ein untergeordnetes Gerät (via_device → Site).
+
+        HA liest device_info sehr oft; das Dict wird pro Gerät gecacht und nur neu
+        gebaut, wenn sich der Name aus den Metadaten geändert hat.
+        """
+        friendly = self.get_device_name(dev_id)
+        cached = self._child_device_info.get(dev_id)
+        if cached is not None and cached[0] == friendly:
+            return cached[1]
+        short = dev_id[-6:] if len(dev_id) >= 6 else dev_id
+        info = {
+            "identifiers": {(DOMAIN, f"device_{dev_id}")},
+            "name": friendly or f"Solarmanager Gerät {short}",
+            "manufacturer": MANUFACTURER,
+            "model": "Stream device",
+            "via_device": (DOMAIN, f"site_{self.site_id}"),
+        }
+        self._child_device_info[dev_id] = (friendly, info)
+        return info
+
+    @property
+    def device_types(self) -> dict[str, str]:
+        """Gerätetyp je _id aus den Metadaten, kleingeschrieben ("" wenn unbekannt)."""
+        return self._type_by_id
 
     def get_device_name(self, dev_id: str) -> str | None:
         """Freundlichen Namen für ein Gerät liefern (exaktes Mapping via _id)."""
-        m = self.device_meta.get(str(dev_id))
-        return (m or {}).get("name")
+        return self._name_by_id.get(str(dev_id))
 
-    async def async_put_battery_merged(self, dev_id: str, changes: dict[str, Any]) -> None:
-        """Batterie-Settings als vollständiges Objekt schreiben (read-modify-write).
+    @property
+    def stream_devices(self) -> dict[str, dict[str, Any]]:
+        """Geräte aus devices[] des letzten Polls, indiziert per (str-)_id."""
+        return self._device_index
 
-        Liest die aktuellen Settings aus den gecachten Metadaten, überlagert die
-        geänderten Felder und sendet das komplette Objekt. So setzt das Backend
-        keine nicht-gesendeten Felder auf ihre Defaults zurück (siehe
-        BATTERY_PUT_FIELDS).
+    def get_stream_device(self, dev_id: str) -> dict[str, Any] | None:
+        """Gerät aus devices[] des letzten Polls anhand der _id (Dict-Lookup)."""
+        return self._device_index.get(dev_id)
+
+    def get_device_settings(self, dev_id: str) -> dict[str, Any]:
+        """Aktuelle Geräte-Settings (raw.data aus /v1/info/sensors) oder {}."""
+        return self._settings_by_id.get(dev_id) or {}
+
+    def _battery_payload(self, dev_id: str) -> dict[str, Any]:
+        """Aktuelle Batterie-Settings für einen PUT (BATTERY_PUT_FIELDS).
+
+        Ohne gecachte Settings würde das Backend alle nicht gesendeten Felder
+        auf Defaults zurücksetzen — dann lieber gar nicht schreiben.
         """
-        raw_data = (self.device_meta.get(str(dev_id)) or {}).get("raw", {}).get("data", {}) or {}
+        raw_data = self.get_device_settings(str(dev_id))
         payload = {k: raw_data[k] for k in BATTERY_PUT_FIELDS if k in raw_data}
         if not payload:
-            # Ohne gecachte Settings würde das Backend alle nicht gesendeten
-            # Felder auf Defaults zurücksetzen — dann lieber gar nicht schreiben.
             raise HomeAssistantError(
                 translation_domain=DOMAIN,
                 translation_key="battery_settings_not_loaded",
             )
+        return payload
+
+    async def async_put_battery_merged(self, dev_id: str, changes: dict[str, Any]) -> None:
+        """Batterie-Settings als vollständiges Objekt schreiben (read-modify-write).
+
+        Liest die aktuellen Settings aus den gecachten Metadaten, überlagert die
+        geänderten Felder und sendet das komplette Objekt. So setzt das Backend
+        keine nicht-gesendeten Felder auf ihre Defaults zurück (siehe
+        BATTERY_PUT_FIELDS).
+        """
+        payload = self._battery_payload(dev_id)
         payload.update(changes)
         await self.client.put_battery_settings(dev_id, payload)
         await self.async_refresh_device_meta()
 
+    @callback
+    def async_queue_battery_put(self, dev_id: str, changes: dict[str, Any]) -> None:
+        """Batterie-Änderungen sammeln und verzögert als EIN PUT schreiben.
+
+        Beim Ziehen eines Sliders kommen viele Zwischenwerte; jeder Aufruf
+        verlängert das Fenster um BATTERY_DEBOUNCE, danach geht genau ein PUT
+        (+ Meta-Refresh) mit allen Änderungen raus. Kehrt sofort zurück: HA
+        führt Entity-Aktionen unter dem PARALLEL_UPDATES-Semaphor aus, ein
+        wartender Aufrufer würde die nächste Änderung bis nach dem PUT
+        blockieren. Ein fehlgeschlagener PUT wird als Reparatur-Hinweis
+        gemeldet (siehe _async_write_battery).
+        """
+        # Fehlende Settings sofort melden, nicht erst im verzögerten PUT
+        self._battery_payload(dev_id)
+
+        self._pending_battery.setdefault(dev_id, {}).update(changes)
+        if timer := self._pending_battery_timer.get(dev_id):
+            timer.cancel()
+        self._pending_battery_timer[dev_id] = self.hass.loop.call_later(
+            BATTERY_DEBOUNCE, self._flush_battery, dev_id
+        )
+
+    @callback
+    def _flush_battery(self, dev_id: str) -> None:
+        self._pending_battery_timer.pop(dev_id, None)
+        if changes := self._pending_battery.pop(dev_id, None):
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_write_battery(dev_id, changes),
+                f"{DOMAIN} battery PUT {dev_id}",
+            )
+
+    async def _async_write_battery(self, dev_id: str, changes: dict[str, Any]) -> None:
+        async with self._battery_put_lock:
+            issue_id = f"battery_write_failed_{self.entry.entry_id}_{dev_id}"
+            try:
+                await self.async_put_battery_merged(dev_id, changes)
+            except Exception as err:  # Hintergrund-Task: niemand wartet darauf
+                _LOGGER.warning("Writing battery settings for %s failed: %s", dev_id, err)
+                ir.async_create_issue(
+                    self.hass,
+                    DOMAIN,
+                    issue_id,
+                    is_fixable=False,
+                    severity=ir.IssueSeverity.ERROR,
+                    translation_key="battery_write_failed",
+                    translation_placeholders={
+                        "device": self.get_device_name(dev_id) or dev_id,
+                        "error": str(err),
+                    },
+                )
+            else:
+                ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+
+    async def async_shutdown(self) -> None:
+        """Beim Entladen: gesammelte, noch nicht gesendete Änderungen verwerfen."""
+        for timer in self._pending_battery_timer.values():
+            timer.cancel()
+        self._pending_battery_timer.clear()
+        self._pending_battery.clear()
+        await super().async_shutdown()
+
     async def async_refresh_device_meta(self) -> None:
         """Meta sofort neu laden (z. B. nach einem PUT), dann Update anstoßen."""
         await self._load_device_meta()
@@ -279,7 +505,7 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         if not self.client:
             return
         # Auch bei Fehlern erst nach STATS_TTL erneut versuchen (Rate-Limit-Schonung)
-        self._stats_last = time.time()
+        self._stats_last = time.monotonic()
         try:
             now = dt_util.now()
             today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -291,6 +517,30 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         except Exception as e:
             _LOGGER.debug("Could not fetch gateway statistics: %s", e)
 
+    # -------------------- Adaptives Polling --------------------
+
+    def _set_interval(self, seconds: float) -> None:
+        self._cur_interval = seconds
+        self.update_interval = timedelta(seconds=seconds)
+
+    def _backoff_rate_limited(self, err: SolarmanagerRateLimit) -> None:
+        """429: Intervall multiplikativ erhöhen (bzw. Retry-After übernehmen)."""
+        if err.retry_after is not None:
+            target = max(self._base_interval, err.retry_after)
+        else:
+            target = self._cur_interval * 2 * random.uniform(
+                1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER
+            )
+        self._set_interval(min(BACKOFF_MAX_INTERVAL, target))
+        _LOGGER.debug("Rate limited — next poll in %.0f s", self._cur_interval)
+
+    def _recover_interval(self) -> None:
+        """Erfolgreicher Poll: Intervall additiv zurück Richtung Basis."""
+        if self._cur_interval > self._base_interval:
+            self._set_interval(
+                max(self._base_interval, self._cur_interval - BACKOFF_RECOVER_STEP)
+            )
+
     def _raise_mapped_client_error(self, err: Exception) -> NoReturn:
         """Client-Exception auf ConfigEntryAuthFailed/UpdateFailed mappen.
 
@@ -299,6 +549,8 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """
         if isinstance(err, SolarmanagerAuthError):
             raise ConfigEntryAuthFailed(str(err)) from err
+        if isinstance(err, SolarmanagerRateLimit):
+            self._backoff_rate_limited(err)
         if self.last_update_success:
             _LOGGER.warning("Solarmanager not available: %s", err)
         raise UpdateFailed(str(err)) from err
@@ -315,62 +567,39 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 assert isinstance(self.client, SolarmanagerCloud)
                 raw = await self.client.stream_user_v3()
 
-            def _num(x):
-                try:
-                    return float(x) if x is not None else None
-                except Exception:
-                    return None
-
-            def _to_int(x) -> int:
-                try:
-                    return int(x)
-                except Exception:
-                    return 0
-
-            data: dict[str, Any] = {
-                "t": raw.get("t"),
-                "iv": _to_int(raw.get("iv", 0)),
-                # Leistungen (W)
-                "pW": _num(raw.get("pW")),   # PV
-                "cW": _num(raw.get("cW")),   # Verbrauch
-                "bcW": _num(raw.get("bcW")), # Batterie Laden +
-                "bdW": _num(raw.get("bdW")), # Batterie Entladen +
-                "iW": _num(raw.get("iW")),   # Netz Import +
-                "eW": _num(raw.get("eW")),   # Netz Export +
-                # Energie-Intervallwerte (Wh) aus dem Stream
-                "pWh": _num(raw.get("pWh")),
-                "cWh": _num(raw.get("cWh")),
-                "iWh": _num(raw.get("iWh")),
-                "eWh": _num(raw.get("eWh")),
-                "bcWh": _num(raw.get("bcWh")),
-                "bdWh": _num(raw.get("bdWh")),
-                # Batterie
-                "soc": _num(raw.get("soc")),
-                # Geräte-Liste (aus dem Stream, IDs = _id → matchen exakt info/devices._id)
-                "devices": raw.get("devices") or [],
-            }
+            data: dict[str, Any] = {k: as_float(raw.get(k)) for k in STREAM_NUM_KEYS}
+            data["t"] = raw.get("t")
+            data["iv"] = as_int(raw.get("iv")) or 0
+            # Geräte-Liste (aus dem Stream, IDs = _id → matchen exakt info/devices._id)
+            devices = data["devices"] = raw.get("devices") or []
+            # Index _id → Gerät: Entitäten suchen ihr Gerät per Dict-Lookup
+            # statt bei jedem State-Update linear durch devices[] zu laufen.
+            # _id (str) und Messwerte (float/None) werden dabei einmal pro Poll
+            # normalisiert; der Key bleibt erhalten, damit die Entität entsteht.
+            device_index: dict[str, dict[str, Any]] = {}
+            for d in devices:
+                for k in DEVICE_NUM_KEYS:
+                    if k in d:
+                        d[k] = as_float(d[k])
+                if dev_id := d.get("_id"):
+                    d["_id"] = dev_id = str(dev_id)
+                    device_index[dev_id] = d
 
             # Abgeleitet: Batterie-Leistung (Laden +, Entladen -)
-            if data["bcW"] is not None or data["bdW"] is not None:
-                bc = data["bcW"] or 0.0
-                bd = data["bdW"] or 0.0
-                data["batW"] = bc - bd
-            else:
-                data["batW"] = None
+            bc = data["bcW"]
+            bd = data["bdW"]
+            data["batW"] = None if bc is None and bd is None else (bc or 0.0) - (bd or 0.0)
 
             # Abgeleitet: Netzleistung (Import +, Export -)
-            if data["iW"] is not None or data["eW"] is not None:
+            im = data["iW"]
+            ex = data["eW"]
+            if im is not None or ex is not None:
                 # Cloud: iW/eW direkt vom API
-                im = data["iW"] or 0.0
-                ex = data["eW"] or 0.0
-                data["gridW"] = im - ex
+                data["gridW"] = (im or 0.0) - (ex or 0.0)
             elif self.is_local:
                 # Lokal: iW/eW nicht in API → Energiebilanz
                 grid = round(
-                    (data["cW"] or 0.0)
-                    + (data["bcW"] or 0.0)
-                    - (data["pW"] or 0.0)
-                    - (data["bdW"] or 0.0),
+                    (data["cW"] or 0.0) + (bc or 0.0) - (data["pW"] or 0.0) - (bd or 0.0),
                     1,
                 )
                 data["gridW"] = grid
@@ -380,7 +609,7 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 data["gridW"] = None
 
             # Meta nur nach Ablauf des TTL auffrischen (schont das API-Limit)
-            if time.time() - self._meta_last > META_TTL:
+            if time.monotonic() - self._meta_last > META_TTL:
                 await self._load_device_meta()
 
             today = dt_util.now().strftime("%Y-%m-%d")
@@ -392,8 +621,8 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                     # erste Fetch des neuen Tages gelungen ist
                     self._stats_data = {}
                     self._stats_date = today
-                    self._stats_last = 0.0
-                if time.time() - self._stats_last > STATS_TTL:
+                    self._stats_last = float("-inf")
+                if time.monotonic() - self._stats_last > STATS_TTL:
                     await self._load_gateway_stats()
                 data["stat_production"] = self._stats_data.get("production")
                 data["stat_consumption"] = self._stats_data.get("consumption")
@@ -410,7 +639,7 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 data["stat_grid_export"] = max(0.0, (self._stats_data.get("production") or 0) - _sc)
             else:
                 # Lokal: pW/cW/iW/eW (W) über die Zeit integrieren → Wh-Tageszähler
-                now_t = time.time()
+                now_t = time.monotonic()
                 interval_s = (
                     self.update_interval.total_seconds()
                     if self.update_interval
@@ -477,6 +706,8 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             # Tageszähler verzögert persistieren (überleben Neustart/Reload)
             self._store.async_delay_save(self._daily_state, STORAGE_SAVE_DELAY)
 
+            self._recover_interval()
+            self._device_index = device_index
             return data
 
         except (SolarmanagerAuthError, SolarmanagerRateLimit, SolarmanagerApiError) as err:
@@ -484,7 +715,11 @@ class SolarmanagerCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         except HomeAssistantError:
             raise
         except Exception as err:
+            # Nur beim ersten Fehlschlag warnen und den Traceback loggen — bei
+            # längerem Ausfall sonst alle 10 s ein Stacktrace im Log
             if self.last_update_success:
                 _LOGGER.warning("Unexpected error updating Solarmanager: %s", err)
-            _LOGGER.debug("Traceback:", exc_info=True)
+                _LOGGER.debug("Traceback:", exc_info=True)
+            else:
+                _LOGGER.debug("Still failing: %s", err)
             raise UpdateFailed(f"Unexpected: {err}") from err
@@ -11,7 +11,6 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
 from .coordinator import SolarmanagerCoordinator
-from .entity import child_device_info
 
 PARALLEL_UPDATES = 1
 
@@ -55,8 +54,7 @@ async def async_setup_entry(
     @callback
     def _sync_devices() -> None:
         new_entities: list[DateTimeEntity] = []
-        for dev_id, meta in coord.device_meta.items():
-            dev_type = (meta.get("type") or "").lower()
+        for dev_id, dev_type in coord.device_types.items():
             for cfg in DEVICE_DATETIME_CONFIG.get(dev_type, []):
                 uid = f"{dev_id}_{cfg['key']}"
                 if uid not in created:
@@ -89,28 +87,23 @@ class DeviceDateTimeEntity(CoordinatorEntity[SolarmanagerCoordinator], DateTimeE
 
     @property
     def device_info(self) -> dict[str, Any]:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     @property
     def native_value(self) -> datetime | None:
-        meta = self.coordinator.device_meta.get(self._dev_id) or {}
-        v = (meta.get("raw") or {}).get("data", {}).get(self._field)
+        v = self.coordinator.get_device_settings(self._dev_id).get(self._field)
         if v is None:
             return None
         try:
             return dt_util.parse_datetime(str(v))
-        except Exception:
+        except ValueError:
             return None
 
     async def async_set_value(self, value: datetime) -> None:
         iso = dt_util.as_utc(value).strftime("%Y-%m-%dT%H:%M:%S.000Z")
         payload: dict[str, Any] = {self._field: iso}
         if self._carry_fields:
-            raw_data = (
-                (self.coordinator.device_meta.get(self._dev_id) or {})
-                .get("raw", {})
-                .get("data", {})
-            )
+            raw_data = self.coordinator.get_device_settings(self._dev_id)
             for field in self._carry_fields:
                 if field in raw_data:
                     payload[field] = raw_data[field]
@@ -17,6 +17,7 @@ TO_REDACT: set[str] = {
     "sm_id",
     "accessToken",
     "refreshToken",
+    "refresh_token",
     "Authorization",
 }
 
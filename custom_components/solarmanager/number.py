@@ -15,7 +15,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import SolarmanagerCoordinator
-from .entity import child_device_info
+from .entity import as_float
 
 PARALLEL_UPDATES = 1
 
@@ -228,9 +228,7 @@ async def async_setup_entry(
     @callback
     def _sync_devices() -> None:
         new_entities: list[NumberEntity] = []
-        for dev_id, meta in coord.device_meta.items():
-            dev_type = (meta.get("type") or "").lower()
-
+        for dev_id, dev_type in coord.device_types.items():
             # Bestehende Batterie-Eco-Limits (eigene Klasse, unique_ids bleiben stabil)
             if dev_type == "battery":
                 for key, tkey in ECO_FIELDS:
@@ -278,19 +276,14 @@ class BatteryEcoNumber(CoordinatorEntity[SolarmanagerCoordinator], NumberEntity)
 
     @property
     def device_info(self) -> dict[str, Any]:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     @property
     def native_value(self) -> Optional[float]:
-        meta = self.coordinator.device_meta.get(self._dev_id) or {}
-        v = (meta.get("raw") or {}).get("data", {}).get(self._field)
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return as_float(self.coordinator.get_device_settings(self._dev_id).get(self._field))
 
     async def async_set_native_value(self, value: float) -> None:
-        await self.coordinator.async_put_battery_merged(
+        self.coordinator.async_queue_battery_put(
             self._dev_id, {self._field: int(round(value))}
         )
 
@@ -324,24 +317,21 @@ class DeviceNumberEntity(CoordinatorEntity[SolarmanagerCoordinator], NumberEntit
 
     @property
     def device_info(self) -> dict[str, Any]:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     @property
     def native_value(self) -> Optional[float]:
-        meta = self.coordinator.device_meta.get(self._dev_id) or {}
-        v = (meta.get("raw") or {}).get("data", {}).get(self._field)
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return as_float(self.coordinator.get_device_settings(self._dev_id).get(self._field))
 
     async def async_set_native_value(self, value: float) -> None:
         coerced: Any = round(value, 4) if self._float_value else int(round(value))
 
         # Batterie: vollständiges Settings-Objekt schreiben (read-modify-write),
         # damit das Backend keine nicht-gesendeten Felder auf Defaults zurücksetzt.
+        # Mehrere Slider-Änderungen kurz hintereinander → ein gemeinsamer PUT,
+        # der im Hintergrund läuft (blockiert den PARALLEL_UPDATES-Semaphor nicht).
         if self._put_method == "put_battery_settings":
-            await self.coordinator.async_put_battery_merged(
+            self.coordinator.async_queue_battery_put(
                 self._dev_id, {self._field: coerced}
             )
             return
@@ -349,11 +339,7 @@ class DeviceNumberEntity(CoordinatorEntity[SolarmanagerCoordinator], NumberEntit
         payload: dict[str, Any] = {self._field: coerced}
 
         if self._carry_fields:
-            raw_data = (
-                (self.coordinator.device_meta.get(self._dev_id) or {})
-                .get("raw", {})
-                .get("data", {})
-            )
+            raw_data = self.coordinator.get_device_settings(self._dev_id)
             for field in self._carry_fields:
                 if field in raw_data:
                     payload[field] = raw_data[field]
@@ -10,7 +10,6 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import SolarmanagerCoordinator
-from .entity import child_device_info
 
 PARALLEL_UPDATES = 1
 
@@ -192,9 +191,7 @@ async def async_setup_entry(
     @callback
     def _sync_devices() -> None:
         new_entities: list[SelectEntity] = []
-        for dev_id, meta in coord.device_meta.items():
-            dev_type = (meta.get("type") or "").lower()
-
+        for dev_id, dev_type in coord.device_types.items():
             if dev_type in DEVICE_MODE_CONFIG:
                 uid = f"{dev_id}_mode"
                 if uid not in created:
@@ -246,13 +243,11 @@ class _DeviceSelectBase(CoordinatorEntity[SolarmanagerCoordinator], SelectEntity
 
     @property
     def device_info(self) -> dict[str, Any]:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     def _api_label(self) -> str | None:
         """Aktuellen API-Wert auf das Options-Label mappen."""
-        meta = self.coordinator.device_meta.get(self._dev_id) or {}
-        raw_data = (meta.get("raw") or {}).get("data") or {}
-        val = raw_data.get(self._api_key)
+        val = self.coordinator.get_device_settings(self._dev_id).get(self._api_key)
         if val is None:
             return None
         try:
@@ -267,14 +262,14 @@ class _DeviceSelectBase(CoordinatorEntity[SolarmanagerCoordinator], SelectEntity
         if self._optimistic is not None:
             api_label = self._api_label()
             if api_label == self._optimistic or (
-                api_label is not None and time.time() > self._optimistic_until
+                api_label is not None and time.monotonic() > self._optimistic_until
             ):
                 self._optimistic = None
         super()._handle_coordinator_update()
 
     @property
     def current_option(self) -> str | None:
-        if self._optimistic is not None and time.time() <= self._optimistic_until:
+        if self._optimistic is not None and time.monotonic() <= self._optimistic_until:
             return self._optimistic
         return self._api_label() or self._optimistic
 
@@ -294,7 +289,7 @@ class _DeviceSelectBase(CoordinatorEntity[SolarmanagerCoordinator], SelectEntity
             await put_fn(self._dev_id, payload)
             await self.coordinator.async_refresh_device_meta()
         self._optimistic = option
-        self._optimistic_until = time.time() + OPTIMISTIC_TTL
+        self._optimistic_until = time.monotonic() + OPTIMISTIC_TTL
         self.async_write_ha_state()
 
 
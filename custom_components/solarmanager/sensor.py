@@ -1,6 +1,7 @@
 # sensor.py
 from __future__ import annotations
-from typing import Any, Optional
+from functools import partial
+from typing import Any, Callable, Optional
 
 from homeassistant.components.sensor import (
     SensorEntity,
@@ -21,77 +22,65 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import SolarmanagerCoordinator
-from .entity import child_device_info, find_device, site_device_info
+from .entity import as_float, as_int
 
 PARALLEL_UPDATES = 1
 
 # --- Site-weite Sensoren (aus dem Stream) ---
 # (key, translation_key)
 
-POWER_SENSORS = [
+POWER_SENSORS = (
     ("pW", "pv_power"),
     ("cW", "consumption_power"),
     ("batW", "battery_power"),
     ("iW", "grid_import_power"),
     ("eW", "grid_export_power"),
     ("gridW", "grid_power"),
-]
+)
 
 # Intervallwerte (Wh) aus dem Stream — per Default deaktiviert
-ENERGY_SENSORS = [
+ENERGY_SENSORS = (
     ("pWh", "pv_energy_interval"),
     ("cWh", "consumption_energy_interval"),
     ("iWh", "grid_import_energy_interval"),
     ("eWh", "grid_export_energy_interval"),
     ("bcWh", "battery_charge_energy_interval"),
     ("bdWh", "battery_discharge_energy_interval"),
-]
+)
 
 # Tages-Statistiken aus /v1/statistics/gateways/{smId} bzw. lokaler Integration
 # (key, translation_key, unit, device_class, state_class)
-STATS_SENSORS = [
+STATS_SENSORS = (
     ("stat_production", "production_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
     ("stat_consumption", "consumption_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
     ("stat_self_consumption", "self_consumption_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
-]
+)
 
 # Prozentwerte: Cloud liefert sie direkt vom API, lokal werden sie aus
 # stat_production/stat_consumption/stat_self_consumption berechnet.
-STATS_SENSORS_PERCENT = [
+STATS_SENSORS_PERCENT = (
     ("stat_self_consumption_rate", "self_consumption_rate", PERCENTAGE, None, SensorStateClass.MEASUREMENT),
     ("stat_autarchy_degree", "autarchy_degree", PERCENTAGE, None, SensorStateClass.MEASUREMENT),
-]
+)
 
-GRID_STATS_SENSORS = [
+GRID_STATS_SENSORS = (
     ("stat_grid_import", "grid_import_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
     ("stat_grid_export", "grid_export_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
-]
+)
 
-BAT_STATS_SENSORS = [
+BAT_STATS_SENSORS = (
     ("stat_bat_charge", "battery_charge_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
     ("stat_bat_discharge", "battery_discharge_today", UnitOfEnergy.WATT_HOUR, SensorDeviceClass.ENERGY, SensorStateClass.TOTAL_INCREASING),
-]
+)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
     coord: SolarmanagerCoordinator = entry.runtime_data
 
-    # Site-Sensoren
-    site_entities: list[SensorEntity] = [
-        *(SolarmanagerPowerSensor(coord, key, tkey) for key, tkey in POWER_SENSORS),
-        *(SolarmanagerEnergySensor(coord, key, tkey) for key, tkey in ENERGY_SENSORS),
-        SocSensor(coord),
-        DevicesOverviewSensor(coord),
-    ]
-    site_entities += [SolarmanagerStatsSensor(coord, *spec) for spec in STATS_SENSORS]
-    site_entities += [SolarmanagerStatsSensor(coord, *spec) for spec in STATS_SENSORS_PERCENT]
-    site_entities += [SolarmanagerStatsSensor(coord, *spec) for spec in GRID_STATS_SENSORS]
-    site_entities += [SolarmanagerStatsSensor(coord, *spec) for spec in BAT_STATS_SENSORS]
-    async_add_entities(site_entities, True)
-
     # Geräte-Sensoren dynamisch aus devices[] — auch für Geräte, die erst
     # nach dem Setup im Stream auftauchen (Coordinator-Listener).
-    simple_sensors: list[tuple[str, type[_DeviceBase]]] = [
+    # (Feld in devices[], Fabrik(coord, dev_id)) — ein Durchlauf pro Gerät
+    device_sensors: tuple[tuple[str, Callable[[SolarmanagerCoordinator, str], _DeviceBase]], ...] = (
         ("power", DevicePowerSensor),
         ("soc", DeviceSocSensor),
         ("temperature", DeviceTemperatureSensor),
@@ -100,40 +89,68 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_e
         ("switchState", DeviceSwitchStateSensor),
         ("heatingAdjustment", DeviceHeatingAdjustmentSensor),
         ("remainingRange", DeviceRemainingRangeSensor),
-    ]
-    daily_sensors = [
-        ("iWhTotal", "daily_consumption"),
-        ("eWhTotal", "daily_feed_in"),
-    ]
-    created: set[str] = set()
+        ("iWhTotal", partial(DeviceDailyEnergySensor, key="iWhTotal", translation_key="daily_consumption")),
+        ("eWhTotal", partial(DeviceDailyEnergySensor, key="eWhTotal", translation_key="daily_feed_in")),
+    )
+    created: set[tuple[str, str]] = set()
+
+    def _add_device_sensors(entities: list[SensorEntity]) -> None:
+        append = entities.append
+        for dev_id, dev in coord.stream_devices.items():
+            for key, make in device_sensors:
+                if key in dev and (dev_id, key) not in created:
+                    created.add((dev_id, key))
+                    append(make(coord, dev_id))
 
     @callback
     def _sync_device_sensors() -> None:
         new_entities: list[SensorEntity] = []
-        for dev in (coord.data or {}).get("devices", []) or []:
-            dev_id = str(dev.get("_id") or "")
-            if not dev_id:
-                continue
-            for key, cls in simple_sensors:
-                uid = f"{dev_id}_{key}"
-                if key in dev and uid not in created:
-                    created.add(uid)
-                    new_entities.append(cls(coord, dev_id))
-            for key, tkey in daily_sensors:
-                uid = f"{dev_id}_{key}"
-                if key in dev and uid not in created:
-                    created.add(uid)
-                    new_entities.append(DeviceDailyEnergySensor(coord, dev_id, key, tkey))
+        _add_device_sensors(new_entities)
         if new_entities:
             async_add_entities(new_entities, True)
 
-    _sync_device_sensors()
+    # Site- und beim Setup bekannte Geräte-Sensoren in einer Liste, ein Aufruf
+    entities: list[SensorEntity] = []
+    entities.extend(SolarmanagerPowerSensor(coord, key, tkey) for key, tkey in POWER_SENSORS)
+    entities.extend(SolarmanagerEnergySensor(coord, key, tkey) for key, tkey in ENERGY_SENSORS)
+    entities.append(SocSensor(coord))
+    entities.append(DevicesOverviewSensor(coord))
+    for specs in (STATS_SENSORS, STATS_SENSORS_PERCENT, GRID_STATS_SENSORS, BAT_STATS_SENSORS):
+        entities.extend(SolarmanagerStatsSensor(coord, *spec) for spec in specs)
+    _add_device_sensors(entities)
+    async_add_entities(entities, True)
     entry.async_on_unload(coord.async_add_listener(_sync_device_sensors))
 
 
 # ---------- Basisklassen ----------
 
-class _Base(CoordinatorEntity[SolarmanagerCoordinator]):
+_UNWRITTEN = object()
+
+
+class _WriteOnChange(CoordinatorEntity[SolarmanagerCoordinator]):
+    """State nur schreiben, wenn sich Wert oder Verfügbarkeit geändert haben.
+
+    Viele Werte (Tageszähler, Geräte im Standby, …) bleiben über etliche Polls
+    gleich; ohne diese Prüfung schreibt jede Entität bei jedem Poll ihren State.
+    """
+
+    _last_written: Any = _UNWRITTEN
+    # False: bei jedem Poll schreiben (z. B. wenn sich Attribute ändern)
+    _write_on_change: bool = True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self._write_on_change:
+            super()._handle_coordinator_update()
+            return
+        snapshot = (self.available, self.native_value)
+        if snapshot == self._last_written:
+            return
+        self._last_written = snapshot
+        super()._handle_coordinator_update()
+
+
+class _Base(_WriteOnChange):
     _attr_has_entity_name = True
 
     def __init__(self, coordinator: SolarmanagerCoordinator, key: str, translation_key: str):
@@ -141,7 +158,15 @@ class _Base(CoordinatorEntity[SolarmanagerCoordinator]):
         self._key = key
         self._attr_unique_id = f"{coordinator.entry.entry_id}_{key}"
         self._attr_translation_key = translation_key
-        self._attr_device_info = site_device_info(coordinator)
+        self._attr_device_info = coordinator.site_device_info()
+
+    @property
+    def native_value(self) -> Optional[float]:
+        # Alle Site-Sensoren lesen genau einen Key aus den Stream-/Statistikdaten
+        data = self.coordinator.data
+        if data is None:
+            return None
+        return as_float(data.get(self._key))
 
 
 class SolarmanagerPowerSensor(_Base, SensorEntity):
@@ -149,11 +174,6 @@ class SolarmanagerPowerSensor(_Base, SensorEntity):
     _attr_device_class = SensorDeviceClass.POWER
     _attr_native_unit_of_measurement = UnitOfPower.WATT
 
-    @property
-    def native_value(self) -> Optional[float]:
-        v = (self.coordinator.data or {}).get(self._key)
-        return float(v) if isinstance(v, (int, float)) else None
-
 
 class SolarmanagerEnergySensor(_Base, SensorEntity):
     """Intervall-Energiewerte (Wh) aus dem Stream — keine Zähler, daher per
@@ -163,14 +183,6 @@ class SolarmanagerEnergySensor(_Base, SensorEntity):
     _attr_native_unit_of_measurement = UnitOfEnergy.WATT_HOUR
     _attr_entity_registry_enabled_default = False
 
-    @property
-    def native_value(self) -> Optional[float]:
-        v = (self.coordinator.data or {}).get(self._key)
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
-
 
 class SolarmanagerStatsSensor(_Base, SensorEntity):
     """Tages-Statistik-Sensor (production, consumption, … aus /v1/statistics/gateways)."""
@@ -191,14 +203,6 @@ class SolarmanagerStatsSensor(_Base, SensorEntity):
         # Wh-Zähler ohne Nachkommastellen, Prozentwerte mit einer
         self._attr_suggested_display_precision = 1 if unit == PERCENTAGE else 0
 
-    @property
-    def native_value(self) -> Optional[float]:
-        v = (self.coordinator.data or {}).get(self._key)
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
-
 
 class SocSensor(_Base, SensorEntity):
     _attr_device_class = SensorDeviceClass.BATTERY
@@ -208,14 +212,6 @@ class SocSensor(_Base, SensorEntity):
     def __init__(self, coordinator: SolarmanagerCoordinator):
         super().__init__(coordinator, "soc", "battery_soc")
 
-    @property
-    def native_value(self) -> Optional[float]:
-        v = (self.coordinator.data or {}).get("soc")
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
-
 
 class DevicesOverviewSensor(_Base, SensorEntity):
     """Zeigt Anzahl Geräte und komprimierte Attribute aus devices[].
@@ -226,43 +222,55 @@ class DevicesOverviewSensor(_Base, SensorEntity):
 
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_entity_registry_enabled_default = False
+    # Timestamp/Gerätewerte in den Attributen ändern sich bei jedem Poll
+    _write_on_change = False
 
     def __init__(self, coordinator: SolarmanagerCoordinator):
         super().__init__(coordinator, "devices_overview", "devices_overview")
+        self._attr_extra_state_attributes = self._build_attributes()
 
     @property
     def native_value(self):
         devs = (self.coordinator.data or {}).get("devices") or []
         return len(devs)
 
-    @property
-    def extra_state_attributes(self):
+    def _build_attributes(self) -> dict[str, Any]:
+        """Attribute einmal pro Poll bauen statt bei jedem Lesezugriff.
+
+        Messwerte sind bereits im Coordinator auf float/None normalisiert —
+        nur native Typen, damit orjson (Recorder, Websocket) ohne
+        default-Fallback serialisiert.
+        """
         d = self.coordinator.data or {}
-        devs = d.get("devices") or []
-        compact = []
-        for it in devs:
-            compact.append({
-                "id": it.get("_id"),
-                "signal": it.get("signal"),
-                "activeDevice": it.get("activeDevice"),
-                "power_W": it.get("power"),
-                "soc_%": it.get("soc"),
-                "iWh_Wh": it.get("iWh"),
-                "eWh_Wh": it.get("eWh"),
-                "temperature_C": it.get("temperature"),
-                "deviceState": it.get("deviceState"),
-                "switchState": it.get("switchState"),
-            })
         return {
             "timestamp": d.get("t"),
             "interval_s": d.get("iv"),
-            "devices": compact,
+            "devices": [
+                {
+                    "id": it.get("_id"),
+                    "signal": it.get("signal"),
+                    "activeDevice": it.get("activeDevice"),
+                    "power_W": it.get("power"),
+                    "soc_%": it.get("soc"),
+                    "iWh_Wh": it.get("iWh"),
+                    "eWh_Wh": it.get("eWh"),
+                    "temperature_C": it.get("temperature"),
+                    "deviceState": it.get("deviceState"),
+                    "switchState": it.get("switchState"),
+                }
+                for it in d.get("devices") or []
+            ],
         }
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._attr_extra_state_attributes = self._build_attributes()
+        super()._handle_coordinator_update()
+
 
 # ---------- Geräte-Sensoren ----------
 
-class _DeviceBase(CoordinatorEntity[SolarmanagerCoordinator], SensorEntity):
+class _DeviceBase(_WriteOnChange, SensorEntity):
     _attr_has_entity_name = True
 
     def __init__(
@@ -282,14 +290,14 @@ class _DeviceBase(CoordinatorEntity[SolarmanagerCoordinator], SensorEntity):
     # Metadaten übernimmt, sobald sie geladen sind
     @property
     def device_info(self) -> dict[str, Any] | None:
-        return child_device_info(self.coordinator, self._dev_id)
+        return self.coordinator.child_device_info(self._dev_id)
 
     @property
     def available(self) -> bool:
         return super().available and self._dev() is not None
 
     def _dev(self) -> dict[str, Any] | None:
-        return find_device(self.coordinator.data, self._dev_id)
+        return self.coordinator.get_stream_device(self._dev_id)
 
     def _dev_value(self) -> Any:
         d = self._dev()
@@ -306,11 +314,7 @@ class DevicePowerSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return self._dev_value()
 
 
 class DeviceSocSensor(_DeviceBase):
@@ -323,11 +327,7 @@ class DeviceSocSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return self._dev_value()
 
 
 class DeviceTemperatureSensor(_DeviceBase):
@@ -340,11 +340,7 @@ class DeviceTemperatureSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return self._dev_value()
 
 
 class DeviceActiveStateSensor(_DeviceBase):
@@ -356,11 +352,7 @@ class DeviceActiveStateSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[int]:
-        v = self._dev_value()
-        try:
-            return int(v) if v is not None else None
-        except Exception:
-            return None
+        return as_int(self._dev_value())
 
 
 class DeviceDailyEnergySensor(_DeviceBase):
@@ -371,12 +363,8 @@ class DeviceDailyEnergySensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            f = float(v) if v is not None else None
-            return None if f is not None and f < 0 else f
-        except Exception:
-            return None
+        f = self._dev_value()
+        return None if f is not None and f < 0 else f
 
 
 class DeviceOperationStateSensor(_DeviceBase):
@@ -388,11 +376,7 @@ class DeviceOperationStateSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[int]:
-        v = self._dev_value()
-        try:
-            return int(v) if v is not None else None
-        except Exception:
-            return None
+        return as_int(self._dev_value())
 
 
 class DeviceSwitchStateSensor(_DeviceBase):
@@ -404,11 +388,7 @@ class DeviceSwitchStateSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[int]:
-        v = self._dev_value()
-        try:
-            return int(v) if v is not None else None
-        except Exception:
-            return None
+        return as_int(self._dev_value())
 
 
 class DeviceHeatingAdjustmentSensor(_DeviceBase):
@@ -420,11 +400,7 @@ class DeviceHeatingAdjustmentSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return self._dev_value()
 
 
 class DeviceRemainingRangeSensor(_DeviceBase):
@@ -437,8 +413,4 @@ class DeviceRemainingRangeSensor(_DeviceBase):
 
     @property
     def native_value(self) -> Optional[float]:
-        v = self._dev_value()
-        try:
-            return float(v) if v is not None else None
-        except Exception:
-            return None
+        return self._dev_value()
@@ -1,10 +1,14 @@
 """Tests für den Cloud-API-Client: Fehler-Mapping und 401-Retry."""
+import time
+from unittest.mock import patch
+
 import aiohttp
 import pytest
 
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from custom_components.solarmanager.api_client import (
+    PUT_MAX_RETRIES,
     SolarmanagerApiError,
     SolarmanagerAuthError,
     SolarmanagerCloud,
@@ -125,3 +129,100 @@ async def test_rejected_refresh_token_falls_back_to_full_login(hass, aioclient_m
     methods_paths = [(m, u.path) for m, u, *_ in aioclient_mock.mock_calls]
     assert methods_paths.count(("POST", "/v1/oauth/login")) == 2
     assert methods_paths.count(("POST", "/v1/oauth/refresh")) == 1
+
+
+async def test_long_lived_token_is_refreshed_five_minutes_early(hass, aioclient_mock):
+    """Token mit 1 h Laufzeit gilt schon 5 min vor Ablauf als fällig.
+
+    Fängt Uhren-Versatz zum Server ab, ohne erst einen 401 zu kassieren.
+    """
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+
+    client = _client(hass)
+    await client.login()
+
+    assert 3290 < client._exp_ts - time.time() <= 3300
+
+
+async def test_list_devices_conditional_get_returns_none_on_304(hass, aioclient_mock):
+    """Zweiter Abruf sendet den ETag; 304 → None statt erneutem JSON-Decode."""
+    sensors_url = f"{BASE}/v1/info/sensors/SM1"
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+    aioclient_mock.get(sensors_url, json=[{"_id": "d1"}], headers={"ETag": '"v1"'})
+
+    client = _client(hass)
+    await client.login()
+    assert await client.list_devices() == [{"_id": "d1"}]
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(sensors_url, status=304)
+    assert await client.list_devices() is None
+
+    _, _, _, headers = aioclient_mock.mock_calls[-1]
+    assert headers["If-None-Match"] == '"v1"'
+
+
+async def test_list_devices_keeps_no_etag_for_undecodable_body(hass, aioclient_mock):
+    """Kaputte Antwort → ETag nicht merken, nächster Abruf lädt wieder vollständig."""
+    sensors_url = f"{BASE}/v1/info/sensors/SM1"
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+    aioclient_mock.get(sensors_url, text="<html>", headers={"ETag": '"v1"'})
+
+    client = _client(hass)
+    await client.login()
+    with pytest.raises(SolarmanagerApiError):
+        await client.list_devices()
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(sensors_url, json=[{"_id": "d1"}])
+    assert await client.list_devices() == [{"_id": "d1"}]
+
+    _, _, _, headers = aioclient_mock.mock_calls[-1]
+    assert "If-None-Match" not in headers
+
+
+async def test_429_halves_local_request_budget(hass, aioclient_mock):
+    """429 → lokales Request-Budget halbieren, damit Bursts nicht erneut anecken."""
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+    aioclient_mock.get(STREAM_URL, status=429, headers={"Retry-After": "30"})
+
+    client = _client(hass)
+    await client.login()
+    with pytest.raises(SolarmanagerRateLimit) as exc_info:
+        await client.stream_user_v3()
+
+    assert exc_info.value.retry_after == 30.0
+    assert client._rpm_limit == 30
+
+
+async def test_put_retries_transient_errors_then_gives_up(hass, aioclient_mock):
+    """503 beim Steuer-PUT → begrenzt wiederholen, danach SolarmanagerApiError."""
+    put_url = f"{BASE}/v2/control/battery/dev1"
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+    aioclient_mock.put(put_url, status=503)
+
+    client = _client(hass)
+    await client.login()
+    with (
+        patch("custom_components.solarmanager.api_client.PUT_RETRY_BASE", 0),
+        pytest.raises(SolarmanagerApiError),
+    ):
+        await client.put_battery_settings("dev1", {"batteryMode": 1})
+
+    methods_paths = [(m, u.path) for m, u, *_ in aioclient_mock.mock_calls]
+    assert methods_paths.count(("PUT", "/v2/control/battery/dev1")) == 1 + PUT_MAX_RETRIES
+
+
+async def test_put_does_not_retry_client_errors(hass, aioclient_mock):
+    """400 beim Steuer-PUT ist kein transienter Fehler → genau ein Versuch."""
+    put_url = f"{BASE}/v2/control/battery/dev1"
+    aioclient_mock.post(LOGIN_URL, json=_TOKEN_RESPONSE)
+    aioclient_mock.put(put_url, status=400)
+
+    client = _client(hass)
+    await client.login()
+    with pytest.raises(SolarmanagerApiError):
+        await client.put_battery_settings("dev1", {"batteryMode": 1})
+
+    methods_paths = [(m, u.path) for m, u, *_ in aioclient_mock.mock_calls]
+    assert methods_paths.count(("PUT", "/v2/control/battery/dev1")) == 1
@@ -1,17 +1,28 @@
 """Tests für Coordinator-Kernlogik: Batterie-Dedup, Merged-PUT-Guard und Auth-Mapping."""
-from unittest.mock import AsyncMock
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import Platform
 from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import entity_registry as er, issue_registry as ir
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.solarmanager.api_client import (
+    SolarmanagerApiError,
+    SolarmanagerCloud,
+    SolarmanagerRateLimit,
+)
 from custom_components.solarmanager.const import (
     CLOUD_BASE,
     CONF_EMAIL,
     CONF_HOST,
     CONF_MODE,
     CONF_PASSWORD,
+    CONF_REFRESH_TOKEN,
     CONF_SCHEME,
     CONF_SM_ID,
     DOMAIN,
@@ -24,6 +35,7 @@ HOST = "192.168.1.100"
 POINT_URL = f"http://{HOST}/v2/point"
 DEVICES_URL = f"http://{HOST}/v2/devices"
 LOGIN_URL = f"{CLOUD_BASE}/v1/oauth/login"
+REFRESH_URL = f"{CLOUD_BASE}/v1/oauth/refresh"
 
 
 def _local_entry(hass) -> MockConfigEntry:
@@ -152,3 +164,186 @@ async def test_put_battery_merged_sends_full_settings_object(hass):
     assert payload["lowerSocLimit"] == 10
     # Nur Whitelist-Felder (BATTERY_PUT_FIELDS) werden mitgesendet
     assert "unrelatedField" not in payload
+    # Settings kommen aus dem Metadaten-Cache — kein zusätzlicher GET vor dem PUT
+    coord.client.list_devices.assert_not_awaited()
+
+
+async def test_device_meta_setter_rebuilds_lookup_indices(hass):
+    """Name/Settings-Lookups folgen jeder Neuzuweisung von device_meta."""
+    entry = _cloud_entry(hass)
+    coord = SolarmanagerCoordinator(hass, entry)
+    coord.device_meta = {
+        "dev1": {"name": "Akku", "type": "Battery", "raw": {"data": {"upperSocLimit": 90}}}
+    }
+
+    assert coord.get_device_name("dev1") == "Akku"
+    assert coord.device_types == {"dev1": "battery"}
+    assert coord.get_device_settings("dev1") == {"upperSocLimit": 90}
+
+    coord.device_meta = {}
+    assert coord.get_device_name("dev1") is None
+    assert coord.get_device_settings("dev1") == {}
+
+
+async def test_rate_limit_backs_off_and_recovers(hass):
+    """429 mit Retry-After → Intervall übernehmen; Erfolg → schrittweise zurück."""
+    entry = _cloud_entry(hass)
+    coord = SolarmanagerCoordinator(hass, entry)
+    coord.client = AsyncMock(spec=SolarmanagerCloud)
+    coord.client.list_devices.return_value = []
+    coord.client.get_gateway_statistics.return_value = {}
+    coord.client.stream_user_v3.side_effect = SolarmanagerRateLimit(
+        "Rate limited", retry_after=120
+    )
+
+    await coord.async_refresh()
+    assert not coord.last_update_success
+    assert coord.update_interval == timedelta(seconds=120)
+
+    coord.client.stream_user_v3.side_effect = None
+    coord.client.stream_user_v3.return_value = {"t": "2026-07-05T10:00:00Z", "pW": 1}
+    await coord.async_refresh()
+    assert coord.last_update_success
+    assert coord.update_interval == timedelta(seconds=119)
+
+
+async def test_battery_set_value_returns_before_coalesced_put(hass):
+    """number.set_value kehrt sofort zurück; schnelle Änderungen → ein PUT.
+
+    Geht bewusst über den Service: HA serialisiert Entity-Aktionen per
+    PARALLEL_UPDATES, ein auf den PUT wartender Aufruf würde nichts sammeln.
+    """
+    entry = _cloud_entry(hass)
+    coord = SolarmanagerCoordinator(hass, entry)
+    coord.client = AsyncMock(spec=SolarmanagerCloud)
+    coord.client.stream_user_v3.return_value = {"t": "2026-07-05T10:00:00Z"}
+    coord.client.list_devices.return_value = None
+    coord.client.get_gateway_statistics.return_value = {}
+    coord.async_refresh_device_meta = AsyncMock()
+    coord.device_meta = {
+        "dev1": {
+            "name": "Akku",
+            "type": "battery",
+            "raw": {"data": {"batteryMode": 1, "upperSocLimit": 90, "lowerSocLimit": 10}},
+        }
+    }
+    entry.runtime_data = coord
+    entry.mock_state(hass, ConfigEntryState.LOADED)
+    await hass.config_entries.async_forward_entry_setups(entry, [Platform.NUMBER])
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    upper = registry.async_get_entity_id(
+        "number", DOMAIN, f"{entry.entry_id}_dev_dev1_upperSocLimit"
+    )
+    lower = registry.async_get_entity_id(
+        "number", DOMAIN, f"{entry.entry_id}_dev_dev1_lowerSocLimit"
+    )
+
+    with patch("custom_components.solarmanager.coordinator.BATTERY_DEBOUNCE", 0.05):
+        for entity_id, value in ((upper, 80), (lower, 20), (upper, 85)):
+            await hass.services.async_call(
+                "number", "set_value", {"entity_id": entity_id, "value": value}, blocking=True
+            )
+        # Alle Aufrufe sind zurück, bevor der PUT gesendet wurde
+        coord.client.put_battery_settings.assert_not_awaited()
+
+        await asyncio.sleep(0.1)
+        await hass.async_block_till_done()
+
+    coord.client.put_battery_settings.assert_awaited_once()
+    _, payload = coord.client.put_battery_settings.await_args.args
+    assert payload == {"batteryMode": 1, "upperSocLimit": 85, "lowerSocLimit": 20}
+    coord.async_refresh_device_meta.assert_awaited_once()
+
+
+async def test_failed_battery_put_raises_issue_and_next_change_is_sent(hass):
+    """Fehler des Hintergrund-PUT → Reparatur-Hinweis; die nächste Änderung geht trotzdem raus."""
+    entry = _cloud_entry(hass)
+    coord = SolarmanagerCoordinator(hass, entry)
+    coord.client = AsyncMock()
+    coord.client.put_battery_settings.side_effect = [
+        SolarmanagerApiError("boom", status=400),
+        None,
+    ]
+    coord.async_refresh_device_meta = AsyncMock()
+    coord.device_meta = {"dev1": {"raw": {"data": {"batteryMode": 1}}}}
+    issue_id = f"battery_write_failed_{entry.entry_id}_dev1"
+
+    with patch("custom_components.solarmanager.coordinator.BATTERY_DEBOUNCE", 0.01):
+        coord.async_queue_battery_put("dev1", {"batteryMode": 2})
+        await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+        assert ir.async_get(hass).async_get_issue(DOMAIN, issue_id) is not None
+
+        coord.async_queue_battery_put("dev1", {"batteryMode": 3})
+        await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+    assert coord.client.put_battery_settings.await_count == 2
+    _, payload = coord.client.put_battery_settings.await_args.args
+    assert payload == {"batteryMode": 3}
+    # Erfolgreicher PUT räumt den Hinweis wieder ab
+    assert ir.async_get(hass).async_get_issue(DOMAIN, issue_id) is None
+
+
+async def test_shutdown_drops_queued_battery_changes(hass):
+    """Beim Entladen darf kein verzögerter PUT mehr rausgehen."""
+    entry = _cloud_entry(hass)
+    coord = SolarmanagerCoordinator(hass, entry)
+    coord.client = AsyncMock()
+    coord.device_meta = {"dev1": {"raw": {"data": {"batteryMode": 1}}}}
+
+    with patch("custom_components.solarmanager.coordinator.BATTERY_DEBOUNCE", 0.01):
+        coord.async_queue_battery_put("dev1", {"batteryMode": 2})
+        await coord.async_shutdown()
+        await asyncio.sleep(0.05)
+        await hass.async_block_till_done()
+
+    coord.client.put_battery_settings.assert_not_awaited()
+
+
+async def test_stored_refresh_token_skips_password_login(hass, aioclient_mock):
+    """Gespeicherter v1-Refresh-Token → Start via Refresh statt Passwort-Login."""
+    entry = _cloud_entry(hass)
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_REFRESH_TOKEN: "stored"}
+    )
+    aioclient_mock.post(
+        REFRESH_URL,
+        json={"accessToken": "tok", "refreshToken": "rotated", "expiresIn": 3600},
+    )
+    aioclient_mock.get(f"{CLOUD_BASE}/v1/info/sensors/SM1", json=[])
+    aioclient_mock.get(f"{CLOUD_BASE}/v1/statistics/gateways/SM1", json={})
+    aioclient_mock.get(f"{CLOUD_BASE}/v3/users/SM1/data/stream", json={"pW": 1})
+
+    coord = SolarmanagerCoordinator(hass, entry)
+    await coord.async_refresh()
+
+    assert coord.last_update_success
+    methods_paths = [(m, u.path) for m, u, *_ in aioclient_mock.mock_calls]
+    assert ("POST", "/v1/oauth/login") not in methods_paths
+    assert entry.data[CONF_REFRESH_TOKEN] == "rotated"
+
+
+async def test_stream_devices_are_indexed_by_id(hass, aioclient_mock):
+    """devices[] des Polls per _id nachschlagbar (auch numerische IDs als str)."""
+    entry = _local_entry(hass)
+    aioclient_mock.get(DEVICES_URL, json=[])
+    aioclient_mock.get(
+        POINT_URL,
+        json={
+            "t": "2026-07-05T10:00:00Z",
+            "devices": [{"_id": 42, "power": 100, "soc": "55.5", "temperature": "n/a"}, {"power": 5}],
+        },
+    )
+
+    coord = SolarmanagerCoordinator(hass, entry)
+    await coord.async_refresh()
+
+    # _id als str, Messwerte einmal im Coordinator auf float/None normalisiert
+    assert coord.get_stream_device("42") == {
+        "_id": "42", "power": 100.0, "soc": 55.5, "temperature": None,
+    }
+    assert coord.get_stream_device("missing") is None
+    assert list(coord.stream_devices) == ["42"]
@@ -0,0 +1,82 @@
+"""Tests für Sensoren: State nur bei Änderung schreiben (_WriteOnChange)."""
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.solarmanager.const import (
+    CONF_HOST,
+    CONF_MODE,
+    CONF_SCHEME,
+    DOMAIN,
+    MODE_LOCAL,
+)
+from custom_components.solarmanager.coordinator import SolarmanagerCoordinator
+from custom_components.solarmanager.sensor import (
+    DevicesOverviewSensor,
+    SolarmanagerPowerSensor,
+)
+
+HOST = "192.168.1.100"
+
+
+def _coordinator(hass) -> SolarmanagerCoordinator:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_MODE: MODE_LOCAL, CONF_HOST: HOST, CONF_SCHEME: "http"},
+        unique_id=f"local_{HOST}",
+    )
+    entry.add_to_hass(hass)
+    return SolarmanagerCoordinator(hass, entry)
+
+
+def _attach(hass, coord, entity):
+    """Entität wie in async_added_to_hass am Coordinator anmelden."""
+    entity.hass = hass
+    coord.async_add_listener(entity._handle_coordinator_update)
+    return patch.object(entity, "async_write_ha_state")
+
+
+async def test_unchanged_value_skips_state_write(hass):
+    """Zwei Polls mit gleichen Daten → nur ein State-Write; neuer Wert → Write."""
+    coord = _coordinator(hass)
+    sensor = SolarmanagerPowerSensor(coord, "pW", "pv_power")
+
+    with _attach(hass, coord, sensor) as write:
+        coord.async_set_updated_data({"pW": 1500.0, "devices": []})
+        coord.async_set_updated_data({"pW": 1500.0, "devices": []})
+        assert write.call_count == 1
+
+        coord.async_set_updated_data({"pW": 1600.0, "devices": []})
+        assert write.call_count == 2
+
+
+async def test_availability_change_alone_writes_state(hass):
+    """Gleicher Wert, aber Poll fehlgeschlagen → unavailable muss geschrieben werden."""
+    coord = _coordinator(hass)
+    sensor = SolarmanagerPowerSensor(coord, "pW", "pv_power")
+
+    with _attach(hass, coord, sensor) as write:
+        coord.async_set_updated_data({"pW": 1500.0, "devices": []})
+        assert write.call_count == 1
+
+        coord.async_set_update_error(Exception("timeout"))
+        assert not sensor.available
+        assert write.call_count == 2
+
+        coord.async_set_updated_data({"pW": 1500.0, "devices": []})
+        assert write.call_count == 3
+
+
+async def test_devices_overview_writes_on_every_poll(hass):
+    """_write_on_change = False → jeder Poll schreibt (Attribute ändern sich)."""
+    coord = _coordinator(hass)
+    coord.data = {"t": "2026-07-05T10:00:00Z", "devices": []}
+    sensor = DevicesOverviewSensor(coord)
+
+    with _attach(hass, coord, sensor) as write:
+        data = {"t": "2026-07-05T10:00:00Z", "iv": 10, "devices": [{"_id": "d1", "power": 5.0}]}
+        coord.async_set_updated_data(data)
+        coord.async_set_updated_data(data)
+        assert write.call_count == 2
+
+    assert sensor.extra_state_attributes["devices"][0]["power_W"] == 5.0